@@ -11,6 +11,9 @@ import uuid
 import subprocess
 import json
 import re
+import gzip
+import queue
+from collections import deque
 from datetime import datetime
 from functools import partial
 
@@ -20,21 +23,230 @@ SERVER_PORT = 5000
 SERVER_URL = f"http://192.168.1.47:{SERVER_PORT}"  # jika ingin jaringan, ganti ke IP server
 POLL_INTERVAL = 1.0  # detik polling GUI
 FRAME_TIME_WINDOW = 8  # number of recent frames to average
+POLL_BUSY_INTERVAL = 0.5  # worker poll interval while rendering (seconds)
+POLL_IDLE_INTERVAL = 3.0  # worker poll interval while idle (seconds)
+LOG_BATCH_SIZE = 200  # flush early when this many log lines are pending
+TASK_LOG_DIR = "task_logs"  # full raw log per task, gzip compressed
+MAX_TASK_LOGS = 5000  # compacted log entries kept in memory per task
+RAW_LOG_FLUSH_LINES = 1000  # raw log lines buffered per task before they are compressed to disk
+ARCHIVE_PATH = "task_archive.jsonl"  # finished tasks moved out of memory
+ARCHIVE_AFTER = 600  # seconds a done/error/cancelled task stays live before archiving
+ARCHIVE_CHECK_INTERVAL = 30  # seconds between archive sweeps
+TASKS_PAGE_SIZE = 200  # default /tasks page size
+TILE_DIR = "renderq_tiles"  # tile + stitched images, next to the .blend file
+MAX_TILES = 16  # upper limit for tiles_x and tiles_y
 # ---------------------------
 
 # ---- Backend (Flask) ----
 from flask import Flask, request, jsonify
 app = Flask(__name__)
 
+# optional compact encoding for worker traffic (falls back to JSON)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+MSGPACK_MIME = "application/x-msgpack"
+
 # In-memory store (simple)
-WORKERS = {}  # worker_id -> {id, name, on, last_seen, info}
-TASKS = {}    # task_id -> {id, path, start, end, artist, status, assigned_worker, logs[], created_at, updated_at, progress...}
+WORKERS = {}  # worker_id -> {id, name, on, last_seen, info, drain}
+TASKS = {}    # task_id -> Task (live tasks only, finished ones move to ARCHIVE_PATH)
+TILE_GROUPS = {}  # group_id -> {id, path, frame, tiles_x, tiles_y, task_ids, stitched{}, status, errors[], output}
+STITCH_QUEUE = queue.Queue()  # (group_id, tile_index) of finished tiles
 
 LOCK = threading.Lock()
+LOG_FILE_LOCK = threading.Lock()  # serialises appends to the raw gzip logs
+RAW_LOG_BUFFERS = {}  # task_id -> raw log lines not yet written to TASK_LOG_DIR
+ARCHIVE_LOCK = threading.Lock()  # serialises access to the archive file
+ARCHIVE_INDEX = None  # loaded lazily by archive_index()
+ARCHIVE_STATE = {"last_run": None, "last_error": None}  # reported by /tasks
+
+FINISHED_STATUSES = ("done", "error", "cancelled")
 
 def now_iso():
     return datetime.utcnow().isoformat() + "Z"
 
+class Task:
+    __slots__ = ("id", "path", "start", "end", "artist", "status", "assigned_worker", "logs",
+                 "created_at", "updated_at", "finished_at", "cancel_requested",
+                 "current_frame", "total_frames", "progress_percent", "eta_seconds",
+                 "tile_group", "tile_index", "region")
+
+    def __init__(self, id, path, start, end, artist, assigned_worker, tile_group=None, tile_index=None, region=None):
+        self.id = id
+        self.path = path
+        self.start = start
+        self.end = end
+        self.artist = artist
+        self.status = "queued"
+        self.assigned_worker = assigned_worker
+        self.logs = deque(maxlen=MAX_TASK_LOGS)
+        self.created_at = now_iso()
+        self.updated_at = self.created_at
+        self.finished_at = None
+        self.cancel_requested = False
+        # progress fields
+        self.current_frame = None
+        self.total_frames = end - start + 1
+        self.progress_percent = 0.0
+        self.eta_seconds = None
+        # tiled stills: render border (min_x, max_x, min_y, max_y) of one tile
+        self.tile_group = tile_group
+        self.tile_index = tile_index
+        self.region = region
+
+    def set_status(self, status):
+        # caller holds LOCK; every status change goes through here so tile groups stay in sync
+        previous, self.status = self.status, status
+        if status in FINISHED_STATUSES:
+            self.finished_at = now_iso()
+        g = TILE_GROUPS.get(self.tile_group)
+        if g is not None and status != previous:
+            if status == "done":
+                STITCH_QUEUE.put((self.tile_group, self.tile_index))
+            elif status in ("error", "cancelled"):
+                g["errors"].append(f"tile {self.tile_index}: {status}")
+                g["status"] = "error"
+
+    def to_dict(self, include_logs=True):
+        d = {k: getattr(self, k) for k in self.__slots__ if k != "logs"}
+        if include_logs:
+            d["logs"] = list(self.logs)
+        return d
+
+# "Fra:12 Mem:71.25M (Peak 102.90M) | Time:00:00.19 | Rendering 50 / 64 samples"
+# "Fra:12 Mem:... | Time:... | Mem:..., Peak:102.90M | Scene, ViewLayer | Sample 50/64"
+RE_SAMPLE_PROGRESS = re.compile(r"^Fra:\s*(\d+)\b.*?(?:Rendering (\d+) / (\d+) samples|\| Sample (\d+)/(\d+))")
+RE_PEAK_MEM = re.compile(r"Peak[:\s]+([\d.]+)M")
+
+def append_task_log(t, ts, line):
+    # fold consecutive sample-progress lines of the same frame into one summary entry,
+    # everything else (warnings, errors, Saved:, ...) is kept verbatim
+    m = RE_SAMPLE_PROGRESS.search(line)
+    if not m:
+        t.logs.append({"t": ts, "line": line})
+        return
+    frame = int(m.group(1))
+    samples = int(m.group(2) or m.group(4))
+    total = int(m.group(3) or m.group(5))
+    pm = RE_PEAK_MEM.search(line)
+    peak = float(pm.group(1)) if pm else None
+    last = t.logs[-1] if t.logs else None
+    if last is not None and last.get("frame") == frame:
+        last["t_last"] = ts
+        last["samples"] = samples
+        last["total_samples"] = total
+        if peak is not None and (last["peak_mem"] is None or peak > last["peak_mem"]):
+            last["peak_mem"] = peak
+        last["count"] += 1
+    else:
+        last = {"t": ts, "t_last": ts, "frame": frame, "samples": samples,
+                "total_samples": total, "peak_mem": peak, "count": 1}
+        t.logs.append(last)
+    peak_txt = f" | Peak {last['peak_mem']:.2f}M" if last["peak_mem"] is not None else ""
+    last["line"] = f"Fra:{frame} Rendering {last['samples']} / {last['total_samples']} samples{peak_txt} ({last['count']} updates until {last['t_last']})"
+
+def tile_regions(tiles_x, tiles_y):
+    # render borders in blender coordinates (0..1, y up), row by row from the bottom
+    regions = []
+    for row in range(tiles_y):
+        for col in range(tiles_x):
+            regions.append([col / tiles_x, (col + 1) / tiles_x, row / tiles_y, (row + 1) / tiles_y])
+    return regions
+
+def tile_output(gid, name):
+    # "//"-relative output given to blender with -o; blender appends the frame number
+    return f"//{TILE_DIR}/{gid}/{name}_"
+
+def tile_file(blend_path, gid, name, frame):
+    # the same file as seen from the server
+    return os.path.join(os.path.dirname(blend_path), TILE_DIR, gid, f"{name}_{frame:04d}.png")
+
+def stitch_loop():
+    # tiles are full-frame RGBA images, transparent outside their border, so each
+    # finished tile is simply painted over the canvas as soon as it arrives
+    canvases = {}  # group_id -> QImage
+    while True:
+        gid, idx = STITCH_QUEUE.get()
+        with LOCK:
+            # canvases of pruned groups (see prune_tile_groups) are dropped here
+            for stale in [k for k in canvases if k not in TILE_GROUPS]:
+                canvases.pop(stale)
+            g = TILE_GROUPS.get(gid)
+            if g is None:
+                continue
+            path, frame, count = g["path"], g["frame"], len(g["task_ids"])
+        src = tile_file(path, gid, f"tile_{idx}", frame)
+        tile = QtGui.QImage(src)
+        if tile.isNull():
+            with LOCK:
+                g["errors"].append(f"tile {idx}: cannot read {src}")
+                g["status"] = "error"
+            continue
+        canvas = canvases.get(gid)
+        if canvas is None:
+            canvas = QtGui.QImage(tile.size(), QtGui.QImage.Format_ARGB32)
+            canvas.fill(QtCore.Qt.transparent)
+            canvases[gid] = canvas
+        painter = QtGui.QPainter(canvas)
+        painter.drawImage(0, 0, tile)
+        painter.end()
+        # rewritten after every tile so the stitched frame fills in progressively
+        saved = canvas.save(g["output"])
+        with LOCK:
+            if not saved:
+                g["errors"].append(f"tile {idx}: cannot write {g['output']}")
+                g["status"] = "error"
+            g["stitched"].add(idx)
+            if len(g["stitched"]) >= count:
+                if g["status"] != "error":
+                    g["status"] = "done"
+                canvases.pop(gid, None)
+
+def prune_tile_groups():
+    # caller holds LOCK; a group is dropped once all of its tile tasks have been archived
+    for gid, g in list(TILE_GROUPS.items()):
+        if g["status"] != "rendering" and not any(tid in TASKS for tid in g["task_ids"]):
+            del TILE_GROUPS[gid]
+
+def task_log_path(tid):
+    return os.path.join(TASK_LOG_DIR, f"{tid}.log.gz")
+
+def write_raw_log(tid, entries, flush=False):
+    # lines are buffered per task and written as one gzip member once RAW_LOG_FLUSH_LINES
+    # have piled up, or on flush (finished task, archive sweep, /task_log); small members
+    # compress badly. gzip.open reads the members back as one stream
+    with LOG_FILE_LOCK:
+        buf = RAW_LOG_BUFFERS.setdefault(tid, [])
+        buf.extend(f"[{ts}] {line}\n" for ts, line in entries)
+        if not buf or (not flush and len(buf) < RAW_LOG_FLUSH_LINES):
+            if not buf:
+                del RAW_LOG_BUFFERS[tid]
+            return
+        del RAW_LOG_BUFFERS[tid]
+        try:
+            os.makedirs(TASK_LOG_DIR, exist_ok=True)
+            with gzip.open(task_log_path(tid), "at", encoding="utf-8") as f:
+                f.write("".join(buf))
+        except OSError:
+            pass
+
+def flush_raw_logs():
+    for tid in list(RAW_LOG_BUFFERS):
+        write_raw_log(tid, [], flush=True)
+
+def read_payload():
+    # request body as dict, msgpack if the client sent it that way
+    if msgpack is not None and request.mimetype == MSGPACK_MIME:
+        return msgpack.unpackb(request.get_data(), raw=False)
+    return request.json
+
+def reply(obj, status=200):
+    # answer in msgpack only when the client asked for it
+    if msgpack is not None and MSGPACK_MIME in request.headers.get("Accept", ""):
+        return app.response_class(msgpack.packb(obj, use_bin_type=True), status=status, mimetype=MSGPACK_MIME)
+    return jsonify(obj), status
+
 @app.route("/register_worker", methods=["POST"])
 def register_worker():
     payload = request.json
@@ -45,13 +257,14 @@ def register_worker():
             "name": payload.get("name", "worker"),
             "on": payload.get("on", True),
             "info": payload.get("info", {}),
+            "drain": False,
             "last_seen": now_iso()
         }
     return jsonify({"ok": True})
 
 @app.route("/update_worker", methods=["POST"])
 def update_worker():
-    payload = request.json
+    payload = read_payload()
     wid = payload.get("id")
     with LOCK:
         if wid in WORKERS:
@@ -61,9 +274,9 @@ def update_worker():
             if payload.get("name"):
                 WORKERS[wid]["name"] = payload.get("name")
             WORKERS[wid]["last_seen"] = now_iso()
-            return jsonify({"ok": True})
+            return reply({"ok": True})
         else:
-            return jsonify({"ok": False, "error": "unknown worker"}), 404
+            return reply({"ok": False, "error": "unknown worker"}, 404)
 
 @app.route("/list_workers", methods=["GET"])
 def list_workers():
@@ -80,106 +293,462 @@ def is_worker_alive(worker, timeout=5):
     last_seen = datetime.fromisoformat(worker["last_seen"].replace("Z", ""))
     return (datetime.utcnow() - last_seen).total_seconds() <= timeout
 
+def parse_job(payload):
+    # validate one submit payload -> (job, error message)
+    if not isinstance(payload, dict):
+        return None, "job must be an object"
+    try:
+        start = int(payload.get("start", 1))
+        end = int(payload.get("end", start))
+        tiles_x = int(payload.get("tiles_x", 1))
+        tiles_y = int(payload.get("tiles_y", 1))
+    except (TypeError, ValueError):
+        return None, "start/end/tiles_x/tiles_y must be integers"
+    if not payload.get("path"):
+        return None, "path is required"
+    if not (1 <= tiles_x <= MAX_TILES and 1 <= tiles_y <= MAX_TILES):
+        return None, f"tiles_x/tiles_y must be between 1 and {MAX_TILES}"
+    if tiles_x * tiles_y > 1 and start != end:
+        return None, "tiled render needs a single frame (start == end)"
+    return {
+        "path": payload.get("path"),
+        "start": start,
+        "end": end,
+        "artist": payload.get("artist", "unknown"),
+        "assigned": payload.get("assigned_worker"),  # can be None or worker id or 'auto'
+        "tiles_x": tiles_x,
+        "tiles_y": tiles_y,
+    }, None
+
+def first_on_worker():
+    # caller holds LOCK
+    for w in WORKERS.values():
+        if w.get("on"):
+            return w["id"]
+    return None
+
+def create_job(job, auto_worker):
+    # caller holds LOCK; auto_worker is the worker 'auto' resolves to (looked up once per request)
+    assigned = job["assigned"]
+    path, start, end, artist = job["path"], job["start"], job["end"], job["artist"]
+    if job["tiles_x"] * job["tiles_y"] > 1:
+        # one task per tile, left unassigned (unless a worker was picked) so free workers share them
+        gid = str(uuid.uuid4())
+        assigned_worker = assigned if assigned in WORKERS else None
+        task_ids = []
+        for idx, region in enumerate(tile_regions(job["tiles_x"], job["tiles_y"])):
+            task_id = str(uuid.uuid4())
+            TASKS[task_id] = Task(task_id, path, start, start, artist, assigned_worker,
+                                  tile_group=gid, tile_index=idx, region=region)
+            task_ids.append(task_id)
+        TILE_GROUPS[gid] = {
+            "id": gid,
+            "path": path,
+            "frame": start,
+            "tiles_x": job["tiles_x"],
+            "tiles_y": job["tiles_y"],
+            "task_ids": task_ids,
+            "stitched": set(),
+            "status": "rendering",
+            "errors": [],
+            "output": tile_file(path, gid, "stitched", start),
+        }
+        return {"task_id": task_ids[0], "task_ids": task_ids, "tile_group": gid, "assigned_worker": assigned_worker}
+    task_id = str(uuid.uuid4())
+    # if explicitly requested assigned worker but that worker is OFF -> still accept but mark assigned_worker as given (worker won't accept until on)
+    assigned_worker = None
+    if assigned and assigned != "auto":
+        # if that worker exists, keep assigned (even if off)
+        if assigned in WORKERS:
+            assigned_worker = assigned
+    else:
+        # auto: first ON worker
+        assigned_worker = auto_worker
+    TASKS[task_id] = Task(task_id, path, start, end, artist, assigned_worker)
+    return {"task_id": task_id, "assigned_worker": assigned_worker}
+
 @app.route("/submit_task", methods=["POST"])
 def submit_task():
-    payload = request.json
-    path = payload.get("path")
-    start = int(payload.get("start", 1))
-    end = int(payload.get("end", start))
-    artist = payload.get("artist", "unknown")
-    assigned = payload.get("assigned_worker")  # can be None or worker id or 'auto'
+    job, error = parse_job(request.json)
+    if error:
+        return jsonify({"ok": False, "error": error}), 400
     with LOCK:
-        task_id = str(uuid.uuid4())
-        # if explicitly requested assigned worker but that worker is OFF -> still accept but mark assigned_worker as given (worker won't accept until on)
-        assigned_worker = None
-        if assigned and assigned != "auto":
-            # if that worker exists, keep assigned (even if off)
-            if assigned in WORKERS:
-                assigned_worker = assigned
-            else:
-                assigned_worker = None
-        else:
-            # auto: pick first ON worker
-            for w in WORKERS.values():
-                if w.get("on"):
-                    assigned_worker = w["id"]
-                    break
-        TASKS[task_id] = {
-            "id": task_id,
-            "path": path,
-            "start": start,
-            "end": end,
-            "artist": artist,
-            "status": "queued",
-            "assigned_worker": assigned_worker,
-            "logs": [],
-            "created_at": now_iso(),
-            "updated_at": now_iso(),
-            # progress fields
-            "current_frame": None,
-            "total_frames": end - start + 1,
-            "progress_percent": 0.0,
-            "eta_seconds": None
-        }
-    return jsonify({"ok": True, "task_id": task_id, "assigned_worker": assigned_worker})
+        res = create_job(job, first_on_worker())
+    return jsonify(dict(ok=True, **res))
+
+@app.route("/submit_tasks", methods=["POST"])
+def submit_tasks():
+    # bulk submit: {"jobs": [<submit_task payload>, ...]}; all or nothing, results in job order
+    body = request.json
+    if not isinstance(body, dict) or not isinstance(body.get("jobs"), list):
+        return jsonify({"ok": False, "error": "body must be an object with a \"jobs\" list"}), 400
+    jobs = []
+    for i, payload in enumerate(body["jobs"]):
+        job, error = parse_job(payload)
+        if error:
+            return jsonify({"ok": False, "error": f"job {i}: {error}"}), 400
+        jobs.append(job)
+    if not jobs:
+        return jsonify({"ok": False, "error": "no jobs"}), 400
+    with LOCK:
+        auto_worker = first_on_worker()
+        results = [create_job(job, auto_worker) for job in jobs]
+    return jsonify({"ok": True, "task_ids": [r["task_id"] for r in results], "results": results})
+
+@app.route("/tile_groups", methods=["GET"])
+def tile_groups():
+    # stitching state of tiled renders, optionally a single one with ?id=
+    gid = request.args.get("id")
+    with LOCK:
+        groups = [dict(g, stitched=sorted(g["stitched"])) for g in TILE_GROUPS.values() if not gid or g["id"] == gid]
+        return jsonify({"tile_groups": groups})
+
+def claim_task(wid):
+    # caller holds LOCK
+    # Prefer tasks explicitly assigned to this worker first
+    for t in TASKS.values():
+        if t.status == "queued" and (t.assigned_worker == wid):
+            t.status = "assigned"
+            t.assigned_worker = wid
+            t.updated_at = now_iso()
+            return t
+    # Otherwise, give first queued unassigned or assigned to None
+    for t in TASKS.values():
+        if t.status == "queued" and (t.assigned_worker is None):
+            # ensure this worker is ON (caller should be a worker that is on)
+            t.assigned_worker = wid
+            t.status = "assigned"
+            t.updated_at = now_iso()
+            return t
+    return None
 
 @app.route("/get_task", methods=["GET"])
 def get_task():
     wid = request.args.get("worker_id")
     with LOCK:
-        # Prefer tasks explicitly assigned to this worker first
-        for t in TASKS.values():
-            if t["status"] == "queued" and (t["assigned_worker"] == wid):
-                t["status"] = "assigned"
-                t["assigned_worker"] = wid
-                t["updated_at"] = now_iso()
-                return jsonify({"task": t})
-        # Otherwise, give first queued unassigned or assigned to None
-        for t in TASKS.values():
-            if t["status"] == "queued" and (t["assigned_worker"] is None):
-                # ensure this worker is ON (caller should be a worker that is on)
-                t["assigned_worker"] = wid
-                t["status"] = "assigned"
-                t["updated_at"] = now_iso()
-                return jsonify({"task": t})
-    return jsonify({"task": None})
+        t = claim_task(wid)
+        return reply({"task": t.to_dict() if t else None})
+
+def collect_log_lines(payload):
+    # "log": single line, "logs": [line, ...] or [[iso_time, line], ...] -> (lines, error)
+    raw = []
+    if payload.get("log"):
+        if not isinstance(payload["log"], str):
+            return None, "log must be a string"
+        raw.append((now_iso(), payload["log"]))
+    logs = payload.get("logs") or []
+    if not isinstance(logs, list):
+        return None, "logs must be a list"
+    for i, entry in enumerate(logs):
+        if isinstance(entry, str):
+            raw.append((now_iso(), entry))
+        elif (isinstance(entry, (list, tuple)) and len(entry) == 2
+              and isinstance(entry[0], str) and isinstance(entry[1], str)):
+            raw.append((entry[0], entry[1]))
+        else:
+            return None, f"logs[{i}] must be a line or [time, line]"
+    return raw, None
+
+def apply_task_update(t, payload, raw):
+    # caller holds LOCK
+    status = payload.get("status")
+    extra = payload.get("extra", {})  # can contain progress fields
+    if status:
+        t.set_status(status)
+    for ts, line in raw:
+        append_task_log(t, ts, line)
+    # update progress fields if present
+    if extra:
+        if "current_frame" in extra:
+            t.current_frame = extra["current_frame"]
+        if "total_frames" in extra:
+            t.total_frames = extra["total_frames"]
+        if "progress_percent" in extra:
+            t.progress_percent = extra["progress_percent"]
+        if "eta_seconds" in extra:
+            t.eta_seconds = extra["eta_seconds"]
+    t.updated_at = now_iso()
 
 @app.route("/update_task", methods=["POST"])
 def update_task():
+    payload = read_payload()
+    tid = payload.get("task_id")
+    raw, error = collect_log_lines(payload)
+    if error:
+        return reply({"ok": False, "error": error}, 400)
+    with LOCK:
+        if tid not in TASKS:
+            return reply({"ok": False, "error": "unknown task"}, 404)
+        apply_task_update(TASKS[tid], payload, raw)
+    finished = payload.get("status") in FINISHED_STATUSES
+    if raw or finished:
+        write_raw_log(tid, raw, flush=finished)
+    return reply({"ok": True})
+
+@app.route("/worker/poll", methods=["POST"])
+def worker_poll():
+    # one request per worker tick: heartbeat + availability + batched task updates in,
+    # new assignment + control commands (cancel, set_end, drain) + next poll interval out
+    payload = read_payload()
+    if not isinstance(payload, dict):
+        return reply({"ok": False, "error": "body must be an object"}, 400)
+    wid = payload.get("id")
+    if not wid:
+        return reply({"ok": False, "error": "id is required"}, 400)
+    running = payload.get("running")  # {"task_id", "end"} of the task being rendered, if any
+    if running is not None and not isinstance(running, dict):
+        return reply({"ok": False, "error": "running must be an object"}, 400)
+    if not isinstance(payload.get("updates") or [], list):
+        return reply({"ok": False, "error": "updates must be a list"}, 400)
+    updates = []
+    for i, u in enumerate(payload.get("updates") or []):
+        if not isinstance(u, dict):
+            return reply({"ok": False, "error": f"update {i}: update must be an object"}, 400)
+        raw, error = collect_log_lines(u)
+        if error:
+            return reply({"ok": False, "error": f"update {i}: {error}"}, 400)
+        updates.append((u.get("task_id"), u, raw))
+    applied = []  # (task_id, raw lines, finished) of updates for known tasks
+    commands = []
+    task = None
+    with LOCK:
+        w = WORKERS.get(wid)
+        if w is None:
+            # server restarted or worker never registered: register on the fly
+            w = WORKERS[wid] = {"id": wid, "name": "worker", "on": True, "info": {}, "drain": False}
+        w["on"] = payload.get("on", w["on"])
+        w["info"] = payload.get("info", w["info"])
+        if payload.get("name"):
+            w["name"] = payload.get("name")
+        w["last_seen"] = now_iso()
+        for tid, u, raw in updates:
+            if tid in TASKS:
+                apply_task_update(TASKS[tid], u, raw)
+                applied.append((tid, raw, u.get("status") in FINISHED_STATUSES))
+        if w.get("drain"):
+            # sent once; the worker turns itself OFF after its current task
+            w["drain"] = False
+            commands.append({"cmd": "drain"})
+        elif running:
+            t = TASKS.get(running.get("task_id"))
+            if t is not None and t.cancel_requested:
+                commands.append({"cmd": "cancel", "task_id": t.id})
+            elif t is not None and t.end != running.get("end"):
+                commands.append({"cmd": "set_end", "task_id": t.id, "end": t.end})
+        elif w["on"]:
+            t = claim_task(wid)
+            if t is not None:
+                task = t.to_dict(include_logs=False)
+    for tid, raw, finished in applied:
+        if raw or finished:
+            write_raw_log(tid, raw, flush=finished)
+    interval = POLL_BUSY_INTERVAL if (running or task) else POLL_IDLE_INTERVAL
+    return reply({"ok": True, "task": task, "commands": commands, "interval": interval})
+
+@app.route("/control_task", methods=["POST"])
+def control_task():
+    # action: "cancel" or "set_end" (with "end")
     payload = request.json
     tid = payload.get("task_id")
-    status = payload.get("status")
-    log = payload.get("log")
-    extra = payload.get("extra", {})  # can contain progress fields
+    action = payload.get("action")
     with LOCK:
         if tid not in TASKS:
             return jsonify({"ok": False, "error": "unknown task"}), 404
         t = TASKS[tid]
-        if status:
-            t["status"] = status
-        if log:
-            t["logs"].append({"t": now_iso(), "line": log})
-            if len(t["logs"]) > 5000:
-                t["logs"] = t["logs"][-5000:]
-        # update progress fields if present
-        if extra:
-            if "current_frame" in extra:
-                t["current_frame"] = extra["current_frame"]
-            if "total_frames" in extra:
-                t["total_frames"] = extra["total_frames"]
-            if "progress_percent" in extra:
-                t["progress_percent"] = extra["progress_percent"]
-            if "eta_seconds" in extra:
-                t["eta_seconds"] = extra["eta_seconds"]
-        t["updated_at"] = now_iso()
+        if t.status in FINISHED_STATUSES:
+            return jsonify({"ok": False, "error": f"task already {t.status}"}), 409
+        if action == "cancel":
+            if t.status == "queued":
+                t.set_status("cancelled")
+            else:
+                t.cancel_requested = True
+        elif action == "set_end":
+            try:
+                end = int(payload.get("end"))
+            except (TypeError, ValueError):
+                return jsonify({"ok": False, "error": "end must be an integer"}), 400
+            if end < t.start:
+                return jsonify({"ok": False, "error": "end is before start"}), 400
+            if t.tile_group:
+                return jsonify({"ok": False, "error": "cannot change the frame of a tile"}), 400
+            t.end = end
+            t.total_frames = end - t.start + 1
+        else:
+            return jsonify({"ok": False, "error": "unknown action"}), 400
+        t.updated_at = now_iso()
+    return jsonify({"ok": True})
+
+@app.route("/drain_worker", methods=["POST"])
+def drain_worker():
+    # worker finishes its current task, then switches itself OFF
+    payload = request.json
+    wid = payload.get("id")
+    with LOCK:
+        if wid not in WORKERS:
+            return jsonify({"ok": False, "error": "unknown worker"}), 404
+        WORKERS[wid]["drain"] = True
     return jsonify({"ok": True})
 
+@app.route("/task_log", methods=["GET"])
+def task_log():
+    # full uncompacted log of a task, as plain text
+    tid = os.path.basename(request.args.get("task_id", ""))
+    if tid in RAW_LOG_BUFFERS:
+        write_raw_log(tid, [], flush=True)
+    path = task_log_path(tid)
+    if not tid or not os.path.exists(path):
+        return jsonify({"ok": False, "error": "no log"}), 404
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return app.response_class(f.read(), mimetype="text/plain")
+
+def archived_logs_path(tid):
+    return os.path.join(TASK_LOG_DIR, f"{tid}.archived.json.gz")
+
+def archive_index():
+    # caller holds ARCHIVE_LOCK; (id, status, artist, assigned_worker, file offset) per archived
+    # task, oldest first, built from ARCHIVE_PATH on first use
+    global ARCHIVE_INDEX
+    if ARCHIVE_INDEX is None:
+        ARCHIVE_INDEX = []
+        if os.path.exists(ARCHIVE_PATH):
+            with open(ARCHIVE_PATH, "rb") as f:
+                while True:
+                    offset = f.tell()
+                    line = f.readline()
+                    if not line:
+                        break
+                    if line.strip():
+                        d = json.loads(line)
+                        ARCHIVE_INDEX.append((d["id"], d["status"], d["artist"], d["assigned_worker"], offset))
+    return ARCHIVE_INDEX
+
+def archive_finished_tasks():
+    # move done/error/cancelled tasks older than ARCHIVE_AFTER out of memory;
+    # the searchable record goes to ARCHIVE_PATH, its logs to a separate file.
+    # Tasks leave TASKS only after both were written
+    flush_raw_logs()
+    now = datetime.utcnow()
+    due = []
+    with LOCK:
+        for t in TASKS.values():
+            if t.status not in FINISHED_STATUSES or not t.finished_at:
+                continue
+            finished = datetime.fromisoformat(t.finished_at.replace("Z", ""))
+            if (now - finished).total_seconds() >= ARCHIVE_AFTER:
+                due.append(t.to_dict())
+    if not due:
+        return 0
+    with ARCHIVE_LOCK:
+        index = archive_index()
+        size = os.path.getsize(ARCHIVE_PATH) if os.path.exists(ARCHIVE_PATH) else 0
+        entries = []
+        try:
+            os.makedirs(TASK_LOG_DIR, exist_ok=True)
+            with open(ARCHIVE_PATH, "ab") as f:
+                for d in due:
+                    with gzip.open(archived_logs_path(d["id"]), "wt", encoding="utf-8") as lf:
+                        json.dump(d.pop("logs"), lf)
+                    offset = f.tell()
+                    f.write((json.dumps(d) + "\n").encode("utf-8"))
+                    entries.append((d["id"], d["status"], d["artist"], d["assigned_worker"], offset))
+        except Exception:
+            # drop a partially appended batch so the retry does not duplicate records
+            if os.path.exists(ARCHIVE_PATH):
+                os.truncate(ARCHIVE_PATH, size)
+            raise
+        index.extend(entries)
+    with LOCK:
+        for d in due:
+            TASKS.pop(d["id"], None)
+        prune_tile_groups()
+    return len(due)
+
+def archive_loop():
+    while True:
+        time.sleep(ARCHIVE_CHECK_INTERVAL)
+        try:
+            archive_finished_tasks()
+            ARCHIVE_STATE["last_error"] = None
+        except Exception as e:
+            ARCHIVE_STATE["last_error"] = f"{now_iso()} {e}"
+        ARCHIVE_STATE["last_run"] = now_iso()
+
 @app.route("/tasks", methods=["GET"])
 def tasks():
-    with LOCK:
-        return jsonify({"tasks": list(TASKS.values())})
+    # filters: status (comma separated), artist, worker, task_id
+    # paging: offset, limit, order=oldest|newest; archived=0 (live only) | 1 (live + archive) | only
+    # logs=1 to include logs, log_tail=N to keep only the last N entries
+    args = request.args
+    statuses = set(s for s in args.get("status", "").split(",") if s)
+    artist = args.get("artist")
+    worker = args.get("worker")
+    task_id = args.get("task_id")
+    archived = args.get("archived", "0")
+    newest = args.get("order") == "newest"
+    include_logs = args.get("logs") == "1"
+    try:
+        offset = max(0, int(args.get("offset", 0)))
+        limit = max(0, int(args.get("limit", TASKS_PAGE_SIZE)))
+        log_tail = max(0, int(args.get("log_tail", MAX_TASK_LOGS)))
+    except ValueError:
+        return jsonify({"ok": False, "error": "offset/limit/log_tail must be integers"}), 400
+
+    def match(tid, status, task_artist, assigned_worker):
+        if statuses and status not in statuses:
+            return False
+        if artist and task_artist != artist:
+            return False
+        if worker and assigned_worker != worker:
+            return False
+        if task_id and tid != task_id:
+            return False
+        return True
+
+    page = []
+    total = 0
+    if archived != "only":
+        with LOCK:
+            live = list(TASKS.values())
+            for t in (reversed(live) if newest else live):
+                if not match(t.id, t.status, t.artist, t.assigned_worker):
+                    continue
+                if offset <= total < offset + limit:
+                    d = t.to_dict(include_logs=False)
+                    if include_logs:
+                        d["logs"] = list(t.logs)[-log_tail:] if log_tail else []
+                    page.append(d)
+                total += 1
+    if archived in ("1", "only"):
+        with ARCHIVE_LOCK:
+            index = list(archive_index())
+        hits = []
+        for entry in (reversed(index) if newest else index):
+            if not match(*entry[:4]):
+                continue
+            if offset <= total < offset + limit:
+                hits.append(entry)
+            total += 1
+        if hits:
+            # only the records on this page are read back from disk
+            with ARCHIVE_LOCK, open(ARCHIVE_PATH, "rb") as f:
+                for entry in hits:
+                    f.seek(entry[4])
+                    d = json.loads(f.readline())
+                    d["archived"] = True
+                    page.append(d)
+            if include_logs:
+                for d in page[-len(hits):]:
+                    try:
+                        with gzip.open(archived_logs_path(d["id"]), "rt", encoding="utf-8") as lf:
+                            logs = json.load(lf)
+                    except OSError:
+                        logs = []
+                    d["logs"] = logs[-log_tail:] if log_tail else []
+    return jsonify({"tasks": page, "total": total, "offset": offset, "limit": limit, "archive": dict(ARCHIVE_STATE)})
 
 def run_server():
+    threading.Thread(target=archive_loop, daemon=True).start()
+    threading.Thread(target=stitch_loop, daemon=True).start()
     app.run(host=SERVER_HOST, port=SERVER_PORT, threaded=True)
 
 # ---- CLIENT GUI (PySide6) ----
@@ -205,20 +774,56 @@ QProgressBar { background: #111216; border-radius:6px; height:12px; }
 """
 
 # --------- Utility functions ----------
-def api_post(path, data):
+_http = threading.local()
+
+def http_session():
+    # one keep-alive session per thread (requests.Session is not thread safe)
+    s = getattr(_http, "session", None)
+    if s is None:
+        s = requests.Session()
+        _http.session = s
+    return s
+
+def decode_response(r):
+    if msgpack is not None and r.headers.get("Content-Type", "").startswith(MSGPACK_MIME):
+        return msgpack.unpackb(r.content, raw=False)
+    return r.json()
+
+def api_post(path, data, compact=False):
+    # compact=True -> msgpack body/response when available (hot worker endpoints)
     try:
-        r = requests.post(SERVER_URL + path, json=data, timeout=4)
-        return r.json()
+        if compact and msgpack is not None:
+            headers = {"Content-Type": MSGPACK_MIME, "Accept": MSGPACK_MIME}
+            r = http_session().post(SERVER_URL + path, data=msgpack.packb(data, use_bin_type=True), headers=headers, timeout=4)
+        else:
+            r = http_session().post(SERVER_URL + path, json=data, timeout=4)
+        return decode_response(r)
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
-def api_get(path, params=None):
+def api_get(path, params=None, compact=False):
     try:
-        r = requests.get(SERVER_URL + path, params=params, timeout=4)
-        return r.json()
+        headers = {"Accept": MSGPACK_MIME} if compact and msgpack is not None else None
+        r = http_session().get(SERVER_URL + path, params=params, headers=headers, timeout=4)
+        return decode_response(r)
     except Exception as e:
         return {"ok": False, "error": str(e)}
 
+def blender_cmd(t, first, last):
+    cmd = ["blender", "-b", t["path"]]
+    if t.get("region"):
+        # tile of a still: render only its border, keep the full frame size
+        # (transparent outside) so the server can stitch tiles by painting them over each other
+        min_x, max_x, min_y, max_y = t["region"]
+        expr = ("import bpy; r = bpy.context.scene.render; "
+                "r.use_border = True; r.use_crop_to_border = False; "
+                f"r.border_min_x = {min_x!r}; r.border_max_x = {max_x!r}; "
+                f"r.border_min_y = {min_y!r}; r.border_max_y = {max_y!r}; "
+                "r.image_settings.file_format = 'PNG'; r.image_settings.color_mode = 'RGBA'")
+        return cmd + ["--python-expr", expr,
+                      "-o", tile_output(t["tile_group"], f"tile_{t['tile_index']}"), "-f", str(first)]
+    return cmd + ["-s", str(first), "-e", str(last), "-a"]
+
 def format_eta(seconds):
     if seconds is None:
         return "-"
@@ -247,6 +852,11 @@ class WorkerThread(QtCore.QThread):
         self.worker_name = worker_name
         self._running = True
         self._available = True
+        self._wake = threading.Event()  # set to cut an idle wait short
+        self._interval = POLL_IDLE_INTERVAL  # adjusted by the server on every poll
+        self._pending = {}  # task_id -> update sent with the next poll
+        self._task_end = None  # end frame of the running task (may change mid-render)
+        self._cancel_requested = False
         # internal for ETA parsing
         self._frame_times = []  # list of durations between consecutive frames (seconds)
         self._last_frame_time = None
@@ -258,12 +868,16 @@ class WorkerThread(QtCore.QThread):
         self.re_saved = re.compile(r"Saved:.*?(\d+)(?:\D|$)")  # sometimes includes frame number
         self.re_rendered = re.compile(r"Finished rendering.*?(\d+)", re.IGNORECASE)
 
-    def set_available(self, avail: bool):
+    def set_available(self, avail: bool, name=None):
+        # picked up by the next /worker/poll; wake the loop so it goes out now
         self._available = avail
-        api_post("/update_worker", {"id": self.worker_id, "on": avail, "name": self.worker_name, "info": {}})
+        if name:
+            self.worker_name = name
+        self._wake.set()
 
     def stop(self):
         self._running = False
+        self._wake.set()
 
     def _extract_frame_from_line(self, line: str):
         # try multiple regexes
@@ -294,114 +908,178 @@ class WorkerThread(QtCore.QThread):
         # fallback: try to find standalone integers that look like frames when context includes "Time" or "Fra"
         return None
 
+    def _queue_update(self, tid, log=None, extra=None, status=None):
+        # buffered until the next poll; progress keeps only the latest values
+        u = self._pending.setdefault(tid, {"task_id": tid, "logs": []})
+        if log is not None:
+            u["logs"].append([now_iso(), log])
+        if extra:
+            u["extra"] = extra
+        if status:
+            u["status"] = status
+
+    def _pending_lines(self):
+        return sum(len(u["logs"]) for u in self._pending.values())
+
+    def _poll(self, running=None):
+        payload = {"id": self.worker_id, "name": self.worker_name, "on": self._available, "info": {},
+                   "updates": list(self._pending.values())}
+        if running:
+            payload["running"] = running
+        res = api_post("/worker/poll", payload, compact=True)
+        if not isinstance(res, dict) or not res.get("ok"):
+            # keep pending updates for the next attempt
+            return None
+        self._pending = {}
+        self._interval = res.get("interval", self._interval)
+        for c in res.get("commands", []):
+            if c.get("cmd") == "drain":
+                self._available = False
+                self.log_signal.emit("Drain requested: finishing current task, then switching OFF")
+            elif running and c.get("task_id") == running["task_id"]:
+                if c.get("cmd") == "cancel":
+                    self._cancel_requested = True
+                elif c.get("cmd") == "set_end":
+                    self._task_end = int(c["end"])
+                    self.log_signal.emit(f"End frame changed to {self._task_end}")
+        return res
+
+    @staticmethod
+    def _pump_output(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)  # end of output
+
+    def _render_task(self, t):
+        tid = t["id"]
+        start_frame = t.get("start", 1)
+        self._task_end = t.get("end", start_frame)
+        self._cancel_requested = False
+        self._queue_update(tid, log=f"Worker {self.worker_name} started task.", status="running")
+        self.status_signal.emit("running")
+        # reset ETA state
+        self._frame_times = []
+        self._last_frame_time = None
+        self._last_frame_number = None
+        start_time = time.time()
+        frames_seen = set()
+        seg_start = start_frame
+        ret = 0
+        # render in segments so a raised end frame continues after the current run
+        while ret == 0 and not self._cancel_requested and seg_start <= self._task_end:
+            seg_end = self._task_end
+            cmd = blender_cmd(t, seg_start, seg_end)
+            self.log_signal.emit(f"Starting task {tid}: {' '.join(cmd)}")
+            # run subprocess and stream logs
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+            except Exception as e:
+                self._queue_update(tid, log=f"Failed to start blender: {e}", status="error")
+                self.log_signal.emit(f"Failed to start blender: {e}")
+                return
+            stopped_early = False
+            last_poll = time.time()
+            # stdout is read on its own thread so polling (heartbeat, commands) keeps
+            # its pace while blender is silent (BVH build, long samples, compositing)
+            lines = queue.Queue()
+            threading.Thread(target=self._pump_output, args=(proc.stdout, lines), daemon=True).start()
+            while True:
+                try:
+                    line = lines.get(timeout=max(0.0, self._interval - (time.time() - last_poll)))
+                except queue.Empty:
+                    line = ""
+                if line is None:
+                    break
+                if line:
+                    line_stripped = line.rstrip()
+                    self._queue_update(tid, log=line_stripped)
+                    self.log_signal.emit(line_stripped)
+                    # attempt to parse a frame number
+                    frame_num = self._extract_frame_from_line(line_stripped)
+                    fra = self.re_frame.search(line_stripped)
+                    if fra and int(fra.group(1)) > self._task_end:
+                        # end frame was lowered below the frame blender is rendering now
+                        if not stopped_early:
+                            stopped_early = True
+                            proc.terminate()
+                    elif frame_num is not None:
+                        now_t = time.time()
+                        # update frame times and compute average
+                        if self._last_frame_number is not None and frame_num != self._last_frame_number:
+                            # accept only forward increments (or any change) but compute delta
+                            if self._last_frame_time is not None:
+                                delta = max(0.0001, now_t - self._last_frame_time)
+                                self._frame_times.append(delta)
+                                if len(self._frame_times) > FRAME_TIME_WINDOW:
+                                    self._frame_times.pop(0)
+                        self._last_frame_time = now_t
+                        self._last_frame_number = frame_num
+                        frames_seen.add(frame_num)
+                        # compute average frame time
+                        if len(self._frame_times) > 0:
+                            avg = sum(self._frame_times) / len(self._frame_times)
+                        else:
+                            # fallback: use elapsed / frames_seen
+                            elapsed = now_t - start_time
+                            if len(frames_seen) > 0:
+                                avg = elapsed / max(1, len(frames_seen))
+                            else:
+                                avg = None
+                        # calculate progress & ETA
+                        total = self._task_end - start_frame + 1
+                        # derive completed frames as max seen - start +1 clipped
+                        completed = max(0, frame_num - start_frame + 1)
+                        percent = min(100.0, (completed / total) * 100.0) if total > 0 else 0.0
+                        eta_s = None
+                        if avg is not None:
+                            remaining = max(0, total - completed)
+                            eta_s = remaining * avg
+                        self._queue_update(tid, extra={
+                            "current_frame": frame_num,
+                            "total_frames": total,
+                            "progress_percent": round(percent, 2),
+                            "eta_seconds": int(round(eta_s)) if eta_s is not None else None
+                        })
+                        # also emit locally
+                        self.progress_signal.emit({
+                            "current_frame": frame_num,
+                            "total_frames": total,
+                            "percent": round(percent,2),
+                            "eta_seconds": int(round(eta_s)) if eta_s is not None else None
+                        })
+                if self._pending_lines() >= LOG_BATCH_SIZE or time.time() - last_poll >= self._interval:
+                    self._poll(running={"task_id": tid, "end": self._task_end})
+                    last_poll = time.time()
+                    if self._cancel_requested and proc.poll() is None:
+                        proc.terminate()
+            ret = proc.wait()
+            if stopped_early and not self._cancel_requested:
+                ret = 0
+            seg_start = seg_end + 1
+        if self._cancel_requested:
+            self._queue_update(tid, log="Worker cancelled task.", status="cancelled")
+            self.log_signal.emit(f"Task {tid} cancelled")
+        elif ret == 0:
+            self._queue_update(tid, log=f"Worker finished: exit {ret}", status="done")
+            self.log_signal.emit(f"Task {tid} finished (exit {ret})")
+        else:
+            self._queue_update(tid, log=f"Worker finished with error: exit {ret}", status="error")
+            self.log_signal.emit(f"Task {tid} finished with error (exit {ret})")
+
     def run(self):
         # register initially
         api_post("/register_worker", {"id": self.worker_id, "name": self.worker_name, "on": self._available, "info": {}})
         self.log_signal.emit(f"[{now_iso()}] Worker registered: {self.worker_name} ({self.worker_id})")
         while self._running:
             try:
-                # heartbeat update
-                api_post("/update_worker", {"id": self.worker_id, "on": self._available, "name": self.worker_name, "info": {}})
-                if self._available:
-                    res = api_get("/get_task", params={"worker_id": self.worker_id})
-                    if isinstance(res, dict) and res.get("task"):
-                        t = res["task"]
-                        tid = t["id"]
-                        total_frames = t.get("total_frames", t.get("end", t.get("end", t["end"])) - t.get("start", t["start"]) + 1)
-                        cmd = [
-                            "blender", "-b", t["path"],
-                            "-s", str(t["start"]), "-e", str(t["end"]), "-a"
-                        ]
-                        api_post("/update_task", {"task_id": tid, "status": "running", "log": f"Worker {self.worker_name} started task."})
-                        self.status_signal.emit("running")
-                        self.log_signal.emit(f"Starting task {tid}: {' '.join(cmd)}")
-                        # reset ETA state
-                        self._frame_times = []
-                        self._last_frame_time = None
-                        self._last_frame_number = None
-                        # run subprocess and stream logs
-                        try:
-                            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
-                        except Exception as e:
-                            api_post("/update_task", {"task_id": tid, "status": "error", "log": f"Failed to start blender: {e}"})
-                            self.log_signal.emit(f"Failed to start blender: {e}")
-                            continue
-                        # read stdout line by line
-                        start_time = time.time()
-                        frames_seen = set()
-                        while True:
-                            line = proc.stdout.readline()
-                            if not line:
-                                if proc.poll() is not None:
-                                    break
-                                time.sleep(0.05)
-                                continue
-                            line_stripped = line.rstrip()
-                            # send raw log line to server
-                            api_post("/update_task", {"task_id": tid, "log": line_stripped})
-                            self.log_signal.emit(line_stripped)
-                            # attempt to parse a frame number
-                            frame_num = self._extract_frame_from_line(line_stripped)
-                            if frame_num is not None:
-                                now_t = time.time()
-                                # update frame times and compute average
-                                if self._last_frame_number is not None and frame_num != self._last_frame_number:
-                                    # accept only forward increments (or any change) but compute delta
-                                    if self._last_frame_time is not None:
-                                        delta = max(0.0001, now_t - self._last_frame_time)
-                                        self._frame_times.append(delta)
-                                        if len(self._frame_times) > FRAME_TIME_WINDOW:
-                                            self._frame_times.pop(0)
-                                self._last_frame_time = now_t
-                                self._last_frame_number = frame_num
-                                frames_seen.add(frame_num)
-                                # compute average frame time
-                                if len(self._frame_times) > 0:
-                                    avg = sum(self._frame_times) / len(self._frame_times)
-                                else:
-                                    # fallback: use elapsed / frames_seen
-                                    elapsed = now_t - start_time
-                                    if len(frames_seen) > 0:
-                                        avg = elapsed / max(1, len(frames_seen))
-                                    else:
-                                        avg = None
-                                # calculate progress & ETA
-                                start_frame = t.get("start", 1)
-                                end_frame = t.get("end", t.get("end", start_frame))
-                                total = end_frame - start_frame + 1
-                                # derive completed frames as max seen - start +1 clipped
-                                completed = max(0, frame_num - start_frame + 1)
-                                percent = min(100.0, (completed / total) * 100.0) if total > 0 else 0.0
-                                eta_s = None
-                                if avg is not None:
-                                    remaining = max(0, total - completed)
-                                    eta_s = remaining * avg
-                                # push progress update
-                                api_post("/update_task", {"task_id": tid, "extra": {
-                                    "current_frame": frame_num,
-                                    "total_frames": total,
-                                    "progress_percent": round(percent, 2),
-                                    "eta_seconds": int(round(eta_s)) if eta_s is not None else None
-                                }})
-                                # also emit locally
-                                self.progress_signal.emit({
-                                    "current_frame": frame_num,
-                                    "total_frames": total,
-                                    "percent": round(percent,2),
-                                    "eta_seconds": int(round(eta_s)) if eta_s is not None else None
-                                })
-                        ret = proc.poll()
-                        if ret == 0:
-                            api_post("/update_task", {"task_id": tid, "status": "done", "log": f"Worker finished: exit {ret}"})
-                            self.log_signal.emit(f"Task {tid} finished (exit {ret})")
-                        else:
-                            api_post("/update_task", {"task_id": tid, "status": "error", "log": f"Worker finished with error: exit {ret}"})
-                            self.log_signal.emit(f"Task {tid} finished with error (exit {ret})")
-                        self.status_signal.emit("idle")
-                    else:
-                        time.sleep(0.8)
-                else:
-                    time.sleep(1.0)
+                # heartbeat + pending updates, maybe a new task back
+                res = self._poll()
+                if res and res.get("task"):
+                    self._render_task(res["task"])
+                    self.status_signal.emit("idle")
+                    continue
+                self._wake.wait(self._interval if res else 2.0)
+                self._wake.clear()
             except Exception as e:
                 self.log_signal.emit(f"Worker loop error: {e}")
                 time.sleep(2.0)
@@ -458,10 +1136,14 @@ class ArtistWindow(QtWidgets.QWidget):
         f_layout.addWidget(QtWidgets.QLabel("Blend file path:"), 1, 0)
         path_h = QtWidgets.QHBoxLayout()
         self.input_path = QtWidgets.QLineEdit()
+        self.input_path.setPlaceholderText("one .blend, or several separated by ';'")
         btn_browse = QtWidgets.QPushButton("Browse")
         btn_browse.clicked.connect(self.browse_file)
+        btn_folder = QtWidgets.QPushButton("Folder")
+        btn_folder.clicked.connect(self.browse_folder)
         path_h.addWidget(self.input_path)
         path_h.addWidget(btn_browse)
+        path_h.addWidget(btn_folder)
         f_layout.addLayout(path_h, 1, 1)
 
         f_layout.addWidget(QtWidgets.QLabel("Start frame:"), 2, 0)
@@ -476,15 +1158,27 @@ class ArtistWindow(QtWidgets.QWidget):
         self.input_end.setValue(1)
         f_layout.addWidget(self.input_end, 3, 1)
 
+        # tiled still: split one frame into X x Y regions rendered by different workers
+        f_layout.addWidget(QtWidgets.QLabel("Tiles (X x Y):"), 4, 0)
+        tiles_h = QtWidgets.QHBoxLayout()
+        self.input_tiles_x = QtWidgets.QSpinBox()
+        self.input_tiles_x.setRange(1, MAX_TILES)
+        self.input_tiles_y = QtWidgets.QSpinBox()
+        self.input_tiles_y.setRange(1, MAX_TILES)
+        tiles_h.addWidget(self.input_tiles_x)
+        tiles_h.addWidget(QtWidgets.QLabel("x"))
+        tiles_h.addWidget(self.input_tiles_y)
+        f_layout.addLayout(tiles_h, 4, 1)
+
         # worker selection
-        f_layout.addWidget(QtWidgets.QLabel("Assign to worker:"), 4, 0)
+        f_layout.addWidget(QtWidgets.QLabel("Assign to worker:"), 5, 0)
         self.worker_combo = QtWidgets.QComboBox()
         self.worker_combo.addItem("Auto (first ON)", "auto")
-        f_layout.addWidget(self.worker_combo, 4, 1)
+        f_layout.addWidget(self.worker_combo, 5, 1)
 
         self.btn_submit = QtWidgets.QPushButton("Submit Task")
         self.btn_submit.clicked.connect(self.submit_task)
-        f_layout.addWidget(self.btn_submit, 5, 0, 1, 2)
+        f_layout.addWidget(self.btn_submit, 6, 0, 1, 2)
 
         left_v.addWidget(form)
 
@@ -512,6 +1206,22 @@ class ArtistWindow(QtWidgets.QWidget):
         self.table.setHorizontalHeaderLabels(["ID", "Artist", "Frames", "Worker", "Status", "Progress", "ETA"])
         self.table.horizontalHeader().setStretchLastSection(True)
         t_layout.addWidget(self.table)
+        # paging (newest tasks first)
+        self.task_page = 0
+        page_h = QtWidgets.QHBoxLayout()
+        self.btn_prev_page = QtWidgets.QPushButton("< Newer")
+        self.btn_prev_page.clicked.connect(partial(self.change_page, -1))
+        self.btn_next_page = QtWidgets.QPushButton("Older >")
+        self.btn_next_page.clicked.connect(partial(self.change_page, 1))
+        self.page_label = QtWidgets.QLabel("")
+        self.page_label.setObjectName("small")
+        page_h.addWidget(self.btn_prev_page)
+        page_h.addWidget(self.page_label, 1)
+        page_h.addWidget(self.btn_next_page)
+        t_layout.addLayout(page_h)
+        self.btn_cancel = QtWidgets.QPushButton("Cancel Selected Task")
+        self.btn_cancel.clicked.connect(self.cancel_task)
+        t_layout.addWidget(self.btn_cancel)
 
         log_box = QtWidgets.QGroupBox("Selected Task Log & Details")
         lg_layout = QtWidgets.QVBoxLayout()
@@ -532,19 +1242,36 @@ class ArtistWindow(QtWidgets.QWidget):
         self.table.itemSelectionChanged.connect(self.on_select_task)
 
     def browse_file(self):
-        fn, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Select .blend file", "", "Blender files (*.blend);;All files (*)")
-        if fn:
-            self.input_path.setText(fn)
+        fns, _ = QtWidgets.QFileDialog.getOpenFileNames(self, "Select .blend file(s)", "", "Blender files (*.blend);;All files (*)")
+        if fns:
+            self.input_path.setText("; ".join(fns))
+
+    def browse_folder(self):
+        # every .blend in the folder becomes its own job
+        folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Select folder with .blend files")
+        if not folder:
+            return
+        fns = sorted(os.path.join(folder, f).replace("\\", "/") for f in os.listdir(folder) if f.lower().endswith(".blend"))
+        if not fns:
+            QtWidgets.QMessageBox.warning(self, "Folder", "No .blend files in that folder.")
+            return
+        self.input_path.setText("; ".join(fns))
 
     def submit_task(self):
-        path = self.input_path.text().strip()
+        paths = [p.strip() for p in self.input_path.text().split(";") if p.strip()]
+        path = paths[0] if paths else ""
         start = int(self.input_start.value())
         end = int(self.input_end.value())
         name = self.input_name.text().strip() or "artist"
         assigned = self.worker_combo.currentData()  # 'auto' or worker id
+        tiles_x = int(self.input_tiles_x.value())
+        tiles_y = int(self.input_tiles_y.value())
         if not path:
             QtWidgets.QMessageBox.warning(self, "Validation", "Please select a .blend path.")
             return
+        if tiles_x * tiles_y > 1 and start != end:
+            QtWidgets.QMessageBox.warning(self, "Validation", "Tiled render needs a single frame (start = end).")
+            return
         # if user selected a specific worker that is offline -> warn
         if assigned and assigned != "auto":
             res_w = api_get("/list_workers")
@@ -559,17 +1286,43 @@ class ArtistWindow(QtWidgets.QWidget):
                     resp = QtWidgets.QMessageBox.question(self, "Worker offline", f"Worker '{chosen['name']}' is currently OFF. Submit anyway (it will stay queued)?", QtWidgets.QMessageBox.Yes | QtWidgets.QMessageBox.No)
                     if resp != QtWidgets.QMessageBox.Yes:
                         return
-        res = api_post("/submit_task", {"path": path, "start": start, "end": end, "artist": name, "assigned_worker": assigned})
+        if len(paths) > 1:
+            # several files: one bulk request, same range/assignment for every file
+            jobs = [{"path": p, "start": start, "end": end, "artist": name, "assigned_worker": assigned,
+                     "tiles_x": tiles_x, "tiles_y": tiles_y} for p in paths]
+            res = api_post("/submit_tasks", {"jobs": jobs})
+            if not res.get("ok"):
+                QtWidgets.QMessageBox.critical(self, "Error", f"Failed to submit: {res.get('error')}")
+                return
+            QtWidgets.QMessageBox.information(self, "Submitted", f"{len(res.get('task_ids', []))} jobs submitted.")
+            self.refresh_all()
+            return
+        res = api_post("/submit_task", {"path": path, "start": start, "end": end, "artist": name, "assigned_worker": assigned,
+                                        "tiles_x": tiles_x, "tiles_y": tiles_y})
         if not res.get("ok"):
             QtWidgets.QMessageBox.critical(self, "Error", f"Failed to submit: {res.get('error')}")
             return
         tid = res.get("task_id")
         assigned_worker = res.get("assigned_worker")
-        QtWidgets.QMessageBox.information(self, "Submitted", f"Task submitted (id={tid}). Assigned worker: {assigned_worker}")
+        if res.get("tile_group"):
+            QtWidgets.QMessageBox.information(self, "Submitted", f"Tiled render submitted: {len(res.get('task_ids', []))} tiles (group={res['tile_group']}).")
+        else:
+            QtWidgets.QMessageBox.information(self, "Submitted", f"Task submitted (id={tid}). Assigned worker: {assigned_worker}")
         # clear form optional
         # self.input_path.clear()
         self.refresh_all()
 
+    def cancel_task(self):
+        sel = self.table.selectedIndexes()
+        if not sel:
+            return
+        tid_item = self.table.item(sel[0].row(), 0)
+        if not tid_item: return
+        res = api_post("/control_task", {"task_id": tid_item.text(), "action": "cancel"})
+        if not res.get("ok"):
+            QtWidgets.QMessageBox.warning(self, "Cancel", f"Failed to cancel: {res.get('error')}")
+        self.refresh_all()
+
     def refresh_workers(self):
         res = api_get("/list_workers")
         if not isinstance(res, dict) or "workers" not in res:
@@ -597,16 +1350,33 @@ class ArtistWindow(QtWidgets.QWidget):
             self.workers_table.setItem(i, 2, QtWidgets.QTableWidgetItem("ON" if w.get("on") else "OFF"))
             self.workers_table.setItem(i, 3, QtWidgets.QTableWidgetItem(w.get("last_seen","")))
 
+    def change_page(self, delta):
+        self.task_page = max(0, self.task_page + delta)
+        self.refresh_tasks()
+
     def refresh_tasks(self):
-        res = api_get("/tasks")
+        res = api_get("/tasks", params={"archived": "1", "order": "newest", "offset": self.task_page * TASKS_PAGE_SIZE, "limit": TASKS_PAGE_SIZE})
         if not isinstance(res, dict) or "tasks" not in res:
             return
+        total = res.get("total", len(res["tasks"]))
+        last_page = max(0, (total - 1) // TASKS_PAGE_SIZE)
+        if self.task_page > last_page:
+            # tasks got archived under us: jump back to the last page
+            self.task_page = last_page
+            return self.refresh_tasks()
         tasks = res["tasks"]
+        first = self.task_page * TASKS_PAGE_SIZE
+        self.page_label.setText(f"{first + 1 if tasks else 0}-{first + len(tasks)} of {total} tasks")
+        self.btn_prev_page.setEnabled(self.task_page > 0)
+        self.btn_next_page.setEnabled(self.task_page < last_page)
         self.table.setRowCount(len(tasks))
         for i, t in enumerate(tasks):
             id_item = QtWidgets.QTableWidgetItem(t["id"])
             artist_item = QtWidgets.QTableWidgetItem(t.get("artist", ""))
-            frames_item = QtWidgets.QTableWidgetItem(f"{t.get('start')}-{t.get('end')}")
+            if t.get("tile_group"):
+                frames_item = QtWidgets.QTableWidgetItem(f"{t.get('start')} tile {t.get('tile_index')}")
+            else:
+                frames_item = QtWidgets.QTableWidgetItem(f"{t.get('start')}-{t.get('end')}")
             worker_item = QtWidgets.QTableWidgetItem(str(t.get("assigned_worker")))
             status_item = QtWidgets.QTableWidgetItem(t.get("status"))
             prog = t.get("progress_percent", 0.0) or 0.0
@@ -631,7 +1401,7 @@ class ArtistWindow(QtWidgets.QWidget):
         tid_item = self.table.item(row, 0)
         if not tid_item: return
         tid = tid_item.text()
-        res = api_get("/tasks")
+        res = api_get("/tasks", params={"task_id": tid, "archived": "1", "logs": "1", "log_tail": 200})
         if not res.get("tasks"): return
         for t in res["tasks"]:
             if t["id"] == tid:
@@ -724,9 +1494,7 @@ class WorkerWindow(QtWidgets.QWidget):
         checked = self.toggle.isChecked()
         # update worker name if changed
         newname = self.input_name.text().strip()
-        self.worker_thread.worker_name = newname or self.worker_thread.worker_name
-        self.worker_thread.set_available(checked)
-        api_post("/update_worker", {"id": self.worker_id, "on": checked, "name": newname})
+        self.worker_thread.set_available(checked, newname)
         self.append_log(f"Availability set to {'ON' if checked else 'OFF'}")
 
     def closeEvent(self, event):
@@ -0,0 +1,92 @@
+import gzip
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("PySide6")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.WORKERS.clear()
+    main.TASKS.clear()
+    main.RAW_LOG_BUFFERS.clear()
+    main.TILE_GROUPS.clear()
+    monkeypatch.setattr(main, "ARCHIVE_INDEX", None)
+    return main.app.test_client()
+
+
+def submit(client, **job):
+    job.setdefault("path", "/a.blend")
+    return client.post("/submit_task", json=job).json["task_id"]
+
+
+@pytest.mark.parametrize("logs", [[["t"]], [5], "x", [["t", 1]]])
+def test_bad_log_entries_are_rejected(client, logs):
+    tid = submit(client)
+    r = client.post("/update_task", json={"task_id": tid, "logs": logs})
+    assert r.status_code == 400
+    r = client.post("/worker/poll", json={"id": "w1", "updates": [{"task_id": tid, "logs": logs}]})
+    assert r.status_code == 400
+
+
+def test_raw_log_is_buffered_until_finished(client):
+    tid = submit(client)
+    client.post("/update_task", json={"task_id": tid, "logs": ["a", "b"]})
+    assert not os.path.exists(main.task_log_path(tid))
+    client.post("/update_task", json={"task_id": tid, "status": "done", "log": "c"})
+    with gzip.open(main.task_log_path(tid), "rt", encoding="utf-8") as f:
+        lines = [l.split("] ", 1)[1] for l in f.read().splitlines()]
+    assert lines == ["a", "b", "c"]
+
+
+def test_archive_keeps_tasks_when_write_fails(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ARCHIVE_AFTER", 0)
+    tid = submit(client)
+    client.post("/update_task", json={"task_id": tid, "status": "done", "log": "finished"})
+
+    monkeypatch.setattr(main, "ARCHIVE_PATH", str(tmp_path / "missing" / "archive.jsonl"))
+    with pytest.raises(OSError):
+        main.archive_finished_tasks()
+    assert tid in main.TASKS
+    assert client.get("/tasks?archived=1").json["total"] == 1
+
+    monkeypatch.setattr(main, "ARCHIVE_PATH", str(tmp_path / "archive.jsonl"))
+    assert main.archive_finished_tasks() == 1
+    assert tid not in main.TASKS
+    res = client.get(f"/tasks?archived=1&task_id={tid}&logs=1").json
+    assert res["total"] == 1
+    assert res["tasks"][0]["archived"] is True
+    assert res["tasks"][0]["logs"][-1]["line"] == "finished"
+
+
+@pytest.mark.parametrize("body", [[1], "x", {"id": "w1", "updates": [1]}, {"id": "w1", "updates": "x"},
+                                  {"id": "w1", "running": 1}, {"on": True}])
+def test_bad_poll_bodies_are_rejected(client, body):
+    r = client.post("/worker/poll", json=body)
+    assert r.status_code == 400
+    assert main.WORKERS == {}
+
+
+def test_duplicate_done_queues_tile_once(client, monkeypatch):
+    monkeypatch.setattr(main, "STITCH_QUEUE", main.queue.Queue())
+    r = client.post("/submit_task", json={"path": "/a.blend", "tiles_x": 2, "tiles_y": 1})
+    tid = r.json["task_ids"][0]
+    for _ in range(2):
+        client.post("/update_task", json={"task_id": tid, "status": "done"})
+    assert main.STITCH_QUEUE.qsize() == 1
+    gid = main.TASKS[tid].tile_group
+    assert client.get("/tile_groups", query_string={"id": gid}).json["tile_groups"][0]["stitched"] == []
+
+
+@pytest.mark.parametrize("tiles", [(0, 1), (1000, 1000), (main.MAX_TILES + 1, 1)])
+def test_tile_counts_out_of_range_are_rejected(client, tiles):
+    r = client.post("/submit_task", json={"path": "/a.blend", "tiles_x": tiles[0], "tiles_y": tiles[1]})
+    assert r.status_code == 400
+    assert main.TASKS == {} and main.TILE_GROUPS == {}
@@ -0,0 +1,56 @@
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("PySide6")
+msgpack = pytest.importorskip("msgpack")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import main  # noqa: E402
+
+
+class _Resp:
+    # what decode_response() reads from a requests.Response
+    def __init__(self, r):
+        self.headers = r.headers
+        self.content = r.data
+
+    def json(self):
+        return json.loads(self.content)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    main.WORKERS.clear()
+    main.TASKS.clear()
+    return main.app.test_client()
+
+
+def test_msgpack_round_trip(client):
+    mime = main.MSGPACK_MIME
+    client.post("/register_worker", json={"id": "w1", "name": "w"})
+    client.post("/submit_task", json={"path": "/a.blend", "start": 1, "end": 10})
+
+    r = client.get("/get_task?worker_id=w1", headers={"Accept": mime})
+    assert r.mimetype == mime
+    task = main.decode_response(_Resp(r))["task"]
+
+    update = {"task_id": task["id"], "logs": [["t0", "Saved: 'x.png'"]], "extra": {"current_frame": 3}}
+    body = msgpack.packb(update, use_bin_type=True)
+    r = client.post("/update_task", data=body, headers={"Content-Type": mime, "Accept": mime})
+    assert r.mimetype == mime
+    assert main.decode_response(_Resp(r)) == {"ok": True}
+    t = main.TASKS[task["id"]]
+    assert t.current_frame == 3
+    assert t.logs[-1]["line"] == "Saved: 'x.png'"
+
+
+def test_json_without_accept(client):
+    r = client.post("/update_worker", json={"id": "nope"})
+    assert r.status_code == 404
+    assert r.mimetype == "application/json"
+    assert main.decode_response(_Resp(r))["ok"] is False